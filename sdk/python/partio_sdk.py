@@ -1,6 +1,25 @@
 """Partio SDK for Python."""
 
+import argparse
+import copy
+import json
+import math
+import os
+import random
+import re
+import sys
+import threading
+import time
+import unicodedata
+from collections import deque
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+
 import requests
+from requests.adapters import HTTPAdapter
 
 
 class PartioError(Exception):
@@ -12,13 +31,281 @@ class PartioError(Exception):
         self.response = response
 
 
+# Response Models
+
+class _Field:
+    """Read-only attribute backed by a key of the raw response dict."""
+
+    __slots__ = ("key",)
+
+    def __init__(self, key):
+        self.key = key
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        return obj._raw.get(self.key)
+
+
+class _LazyModels:
+    """Attribute that wraps a raw list of dicts in models on first access and caches the result."""
+
+    __slots__ = ("key", "model", "slot")
+
+    def __init__(self, key, model, slot):
+        self.key = key
+        self.model = model
+        self.slot = slot
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        try:
+            return getattr(obj, self.slot)
+        except AttributeError:
+            pass
+        raw = obj._raw.get(self.key)
+        value = None if raw is None else [self.model(item) for item in raw]
+        setattr(obj, self.slot, value)
+        return value
+
+
+class _DeferredJson:
+    """Attribute whose raw value may still be undecoded JSON text; decoded on first access and cached."""
+
+    __slots__ = ("key", "slot")
+
+    def __init__(self, key, slot):
+        self.key = key
+        self.slot = slot
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        try:
+            return getattr(obj, self.slot)
+        except AttributeError:
+            pass
+        value = obj._raw.get(self.key)
+        if isinstance(value, str):
+            value = json.loads(value)
+        setattr(obj, self.slot, value)
+        return value
+
+
+# Matches an "Embeddings" member holding a flat or nested numeric array, so the
+# array can be kept as text instead of being decoded into float objects.
+_EMBEDDINGS_MEMBER = re.compile(r'([{,]\s*"Embeddings"\s*:\s*)(\[[^\[\]"]*(?:\[[^\[\]"]*\][^\[\]"]*)*\])')
+
+
+def _loads_deferred(text):
+    """Decode a response body, leaving every Embeddings array as its raw JSON text."""
+    return json.loads(_EMBEDDINGS_MEMBER.sub(r'\1"\2"', text), strict=False)
+
+
+def _plain(value):
+    if isinstance(value, PartioModel):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [_plain(item) for item in value]
+    return value
+
+
+class PartioModel(Mapping):
+    """Typed, read-only view over a raw API response dict.
+
+    Attributes decode fields on access; nested model lists are built, and
+    deferred Embeddings arrays are decoded, on first access only. Dict-style
+    access (result["Chunks"], result.get("Text")) keeps working, and to_dict()
+    returns a fully decoded plain dict.
+    """
+
+    __slots__ = ("_raw",)
+    _lazy = {}
+    _defer_embeddings = False
+
+    def __init__(self, raw):
+        self._raw = raw if raw is not None else {}
+
+    def __getitem__(self, key):
+        if key in self._lazy and key in self._raw:
+            return getattr(self, self._lazy[key])
+        return self._raw[key]
+
+    def __iter__(self):
+        return iter(self._raw)
+
+    def __len__(self):
+        return len(self._raw)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self._raw!r})"
+
+    def to_dict(self):
+        return {key: _plain(self[key]) for key in self._raw}
+
+
+class ChunkResult(PartioModel):
+    __slots__ = ("_embeddings",)
+    _lazy = {"Embeddings": "embeddings"}
+
+    cell_guid = _Field("CellGUID")
+    text = _Field("Text")
+    labels = _Field("Labels")
+    tags = _Field("Tags")
+    embeddings = _DeferredJson("Embeddings", "_embeddings")
+
+
+class SemanticCellResponse(PartioModel):
+    __slots__ = ("_chunks", "_children")
+    _lazy = {"Chunks": "chunks", "Children": "children"}
+    _defer_embeddings = True
+
+    guid = _Field("GUID")
+    parent_guid = _Field("ParentGUID")
+    type = _Field("Type")
+    text = _Field("Text")
+    chunks = _LazyModels("Chunks", ChunkResult, "_chunks")
+
+
+SemanticCellResponse.children = _LazyModels("Children", SemanticCellResponse, "_children")
+
+
+class ChunkResponse(PartioModel):
+    __slots__ = ("_chunks",)
+    _lazy = {"Chunks": "chunks"}
+    _defer_embeddings = True
+
+    guid = _Field("GUID")
+    type = _Field("Type")
+    text = _Field("Text")
+    chunks = _LazyModels("Chunks", ChunkResult, "_chunks")
+    count = _Field("Count")
+
+
+class EmbedResponse(PartioModel):
+    __slots__ = ("_embeddings",)
+    _lazy = {"Embeddings": "embeddings"}
+    _defer_embeddings = True
+
+    success = _Field("Success")
+    status_code = _Field("StatusCode")
+    error = _Field("Error")
+    endpoint_id = _Field("EndpointId")
+    model = _Field("Model")
+    embeddings = _DeferredJson("Embeddings", "_embeddings")
+    count = _Field("Count")
+    dimensions = _Field("Dimensions")
+    l2_normalization = _Field("L2Normalization")
+    response_time_ms = _Field("ResponseTimeMs")
+    request_history_id = _Field("RequestHistoryId")
+    embedding_calls = _Field("EmbeddingCalls")
+    tokenization_profile = _Field("TokenizationProfile")
+
+
+class SummarizeResponse(PartioModel):
+    __slots__ = ()
+
+    success = _Field("Success")
+    status_code = _Field("StatusCode")
+    error = _Field("Error")
+    completion_endpoint_id = _Field("CompletionEndpointId")
+    model = _Field("Model")
+    summary = _Field("Summary")
+    summaries = _Field("Summaries")
+    response_time_ms = _Field("ResponseTimeMs")
+    request_history_id = _Field("RequestHistoryId")
+    completion_calls = _Field("CompletionCalls")
+
+
+class EnumerationResult(PartioModel):
+    __slots__ = ()
+
+    data = _Field("Data")
+    continuation_token = _Field("ContinuationToken")
+    total_count = _Field("TotalCount")
+    has_more = _Field("HasMore")
+
+
+class RequestStatisticsBucket(PartioModel):
+    __slots__ = ()
+
+    time_bucket = _Field("TimeBucket")
+    success_count = _Field("SuccessCount")
+    failure_count = _Field("FailureCount")
+
+
+class RequestStatisticsResponse(PartioModel):
+    __slots__ = ("_buckets",)
+    _lazy = {"Buckets": "buckets"}
+
+    buckets = _LazyModels("Buckets", RequestStatisticsBucket, "_buckets")
+    total_success = _Field("TotalSuccess")
+    total_failure = _Field("TotalFailure")
+
+
+class _TtlCache:
+    """Thread-safe map whose entries expire ttl seconds after they are stored.
+
+    Every invalidation bumps a generation counter. set() drops values whose
+    fetch started before the latest invalidation, so a lookup that races with
+    an update cannot write the stale object back.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self.generation = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            return entry[1]
+
+    def set(self, key, value, generation):
+        with self._lock:
+            if generation == self.generation:
+                self._entries[key] = (time.monotonic() + self.ttl, value)
+
+    def invalidate(self, kind=None, object_id=None):
+        with self._lock:
+            self.generation += 1
+            if kind is None:
+                self._entries.clear()
+            elif object_id is None:
+                for key in [k for k in self._entries if k[0] == kind]:
+                    del self._entries[key]
+            else:
+                self._entries.pop((kind, object_id), None)
+
+
 class PartioClient:
-    """Client for the Partio REST API."""
+    """Client for the Partio REST API.
+
+    With typed_models=True, process, chunk, embed, summarize, enumeration, and
+    statistics calls return PartioModel instances instead of raw dicts.
+
+    With cache_ttl (seconds), tenant, credential, and endpoint lookups are
+    cached and invalidated by this client's own updates and deletes. Cached
+    results are shared between callers and should be treated as read-only.
+    pool_size bounds the number of pooled connections used by bulk_* calls.
+    """
 
-    def __init__(self, endpoint, access_key):
+    def __init__(self, endpoint, access_key, typed_models=False, cache_ttl=None, pool_size=10):
         self.endpoint = endpoint.rstrip("/")
         self.access_key = access_key
+        self.typed_models = typed_models
+        self._cache = _TtlCache(cache_ttl) if cache_ttl else None
         self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
         self.session.headers.update({
             "Authorization": f"Bearer {access_key}",
             "Content-Type": "application/json",
@@ -33,7 +320,7 @@ class PartioClient:
     def close(self):
         self.session.close()
 
-    def _request(self, method, path, json_data=None):
+    def _request(self, method, path, json_data=None, model=None):
         url = f"{self.endpoint}{path}"
         response = self.session.request(method, url, json=json_data)
 
@@ -52,7 +339,33 @@ class PartioClient:
         text = response.text
         if not text:
             return None
-        return response.json()
+        if model is None or not self.typed_models:
+            return response.json()
+        result = _loads_deferred(text) if model._defer_embeddings else response.json()
+        if isinstance(result, list):
+            return [model(item) for item in result]
+        return model(result)
+
+    def _cached_get(self, kind, object_id, path):
+        if self._cache is None:
+            return self._request("GET", path)
+        result = self._cache.get((kind, object_id))
+        if result is None:
+            generation = self._cache.generation
+            result = self._request("GET", path)
+            self._cache.set((kind, object_id), result, generation)
+        return result
+
+    def invalidate_cache(self, kind=None, object_id=None):
+        """Drop cached lookups; kind is "tenants", "credentials", "endpoints", or "completion_endpoints"."""
+        if self._cache is not None:
+            self._cache.invalidate(kind, object_id)
+
+    def _bulk(self, fn, items, max_workers):
+        return [
+            {"Item": item, "Success": error is None, "Result": result, "Error": error}
+            for item, result, error in _run_concurrent(fn, items, max_workers)
+        ]
 
     # Health
     def health(self):
@@ -63,20 +376,20 @@ class PartioClient:
 
     # Process
     def process(self, request):
-        return self._request("POST", "/v1.0/process", request)
+        return self._request("POST", "/v1.0/process", request, SemanticCellResponse)
 
     def process_batch(self, requests_list):
-        return self._request("POST", "/v1.0/process/batch", requests_list)
+        return self._request("POST", "/v1.0/process/batch", requests_list, SemanticCellResponse)
 
     # Chunk & Embed
     def chunk(self, request):
-        return self._request("POST", "/v1.0/chunk", request)
+        return self._request("POST", "/v1.0/chunk", request, ChunkResponse)
 
     def embed(self, request):
-        return self._request("POST", "/v1.0/embed", request)
+        return self._request("POST", "/v1.0/embed", request, EmbedResponse)
 
     def summarize(self, request):
-        return self._request("POST", "/v1.0/summarize", request)
+        return self._request("POST", "/v1.0/summarize", request, SummarizeResponse)
 
     # Explorer
     def explore_embedding_endpoint(self, request):
@@ -90,20 +403,27 @@ class PartioClient:
         return self._request("PUT", "/v1.0/tenants", data)
 
     def get_tenant(self, tenant_id):
-        return self._request("GET", f"/v1.0/tenants/{tenant_id}")
+        return self._cached_get("tenants", tenant_id, f"/v1.0/tenants/{tenant_id}")
 
     def update_tenant(self, tenant_id, data):
-        return self._request("PUT", f"/v1.0/tenants/{tenant_id}", data)
+        try:
+            return self._request("PUT", f"/v1.0/tenants/{tenant_id}", data)
+        finally:
+            self.invalidate_cache("tenants", tenant_id)
 
     def delete_tenant(self, tenant_id):
-        return self._request("DELETE", f"/v1.0/tenants/{tenant_id}")
+        try:
+            return self._request("DELETE", f"/v1.0/tenants/{tenant_id}")
+        finally:
+            # Deleting a tenant removes its credentials and endpoints too.
+            self.invalidate_cache()
 
     def tenant_exists(self, tenant_id):
         response = self.session.head(f"{self.endpoint}/v1.0/tenants/{tenant_id}")
         return response.status_code == 200
 
     def enumerate_tenants(self, req=None):
-        return self._request("POST", "/v1.0/tenants/enumerate", req or {})
+        return self._request("POST", "/v1.0/tenants/enumerate", req or {}, EnumerationResult)
 
     # Users
     def create_user(self, data):
@@ -123,47 +443,59 @@ class PartioClient:
         return response.status_code == 200
 
     def enumerate_users(self, req=None):
-        return self._request("POST", "/v1.0/users/enumerate", req or {})
+        return self._request("POST", "/v1.0/users/enumerate", req or {}, EnumerationResult)
 
     # Credentials
     def create_credential(self, data):
         return self._request("PUT", "/v1.0/credentials", data)
 
     def get_credential(self, credential_id):
-        return self._request("GET", f"/v1.0/credentials/{credential_id}")
+        return self._cached_get("credentials", credential_id, f"/v1.0/credentials/{credential_id}")
 
     def update_credential(self, credential_id, data):
-        return self._request("PUT", f"/v1.0/credentials/{credential_id}", data)
+        try:
+            return self._request("PUT", f"/v1.0/credentials/{credential_id}", data)
+        finally:
+            self.invalidate_cache("credentials", credential_id)
 
     def delete_credential(self, credential_id):
-        return self._request("DELETE", f"/v1.0/credentials/{credential_id}")
+        try:
+            return self._request("DELETE", f"/v1.0/credentials/{credential_id}")
+        finally:
+            self.invalidate_cache("credentials", credential_id)
 
     def credential_exists(self, credential_id):
         response = self.session.head(f"{self.endpoint}/v1.0/credentials/{credential_id}")
         return response.status_code == 200
 
     def enumerate_credentials(self, req=None):
-        return self._request("POST", "/v1.0/credentials/enumerate", req or {})
+        return self._request("POST", "/v1.0/credentials/enumerate", req or {}, EnumerationResult)
 
     # Embedding Endpoints
     def create_endpoint(self, data):
         return self._request("PUT", "/v1.0/endpoints/embedding", data)
 
     def get_endpoint(self, endpoint_id):
-        return self._request("GET", f"/v1.0/endpoints/embedding/{endpoint_id}")
+        return self._cached_get("endpoints", endpoint_id, f"/v1.0/endpoints/embedding/{endpoint_id}")
 
     def update_endpoint(self, endpoint_id, data):
-        return self._request("PUT", f"/v1.0/endpoints/embedding/{endpoint_id}", data)
+        try:
+            return self._request("PUT", f"/v1.0/endpoints/embedding/{endpoint_id}", data)
+        finally:
+            self.invalidate_cache("endpoints", endpoint_id)
 
     def delete_endpoint(self, endpoint_id):
-        return self._request("DELETE", f"/v1.0/endpoints/embedding/{endpoint_id}")
+        try:
+            return self._request("DELETE", f"/v1.0/endpoints/embedding/{endpoint_id}")
+        finally:
+            self.invalidate_cache("endpoints", endpoint_id)
 
     def endpoint_exists(self, endpoint_id):
         response = self.session.head(f"{self.endpoint}/v1.0/endpoints/embedding/{endpoint_id}")
         return response.status_code == 200
 
     def enumerate_endpoints(self, req=None):
-        return self._request("POST", "/v1.0/endpoints/embedding/enumerate", req or {})
+        return self._request("POST", "/v1.0/endpoints/embedding/enumerate", req or {}, EnumerationResult)
 
     def load_endpoint(self, endpoint_id, request=None):
         return self._request("POST", f"/v1.0/endpoints/embedding/{endpoint_id}/load", request or {})
@@ -182,20 +514,26 @@ class PartioClient:
         return self._request("PUT", "/v1.0/endpoints/completion", data)
 
     def get_completion_endpoint(self, endpoint_id):
-        return self._request("GET", f"/v1.0/endpoints/completion/{endpoint_id}")
+        return self._cached_get("completion_endpoints", endpoint_id, f"/v1.0/endpoints/completion/{endpoint_id}")
 
     def update_completion_endpoint(self, endpoint_id, data):
-        return self._request("PUT", f"/v1.0/endpoints/completion/{endpoint_id}", data)
+        try:
+            return self._request("PUT", f"/v1.0/endpoints/completion/{endpoint_id}", data)
+        finally:
+            self.invalidate_cache("completion_endpoints", endpoint_id)
 
     def delete_completion_endpoint(self, endpoint_id):
-        return self._request("DELETE", f"/v1.0/endpoints/completion/{endpoint_id}")
+        try:
+            return self._request("DELETE", f"/v1.0/endpoints/completion/{endpoint_id}")
+        finally:
+            self.invalidate_cache("completion_endpoints", endpoint_id)
 
     def completion_endpoint_exists(self, endpoint_id):
         response = self.session.head(f"{self.endpoint}/v1.0/endpoints/completion/{endpoint_id}")
         return response.status_code == 200
 
     def enumerate_completion_endpoints(self, req=None):
-        return self._request("POST", "/v1.0/endpoints/completion/enumerate", req or {})
+        return self._request("POST", "/v1.0/endpoints/completion/enumerate", req or {}, EnumerationResult)
 
     def load_completion_endpoint(self, endpoint_id, request=None):
         return self._request("POST", f"/v1.0/endpoints/completion/{endpoint_id}/load", request or {})
@@ -209,6 +547,53 @@ class PartioClient:
         """Get health status for all monitored completion endpoints."""
         return self._request("GET", "/v1.0/endpoints/completion/health")
 
+    # Bulk Operations
+    # Each returns one {"Item", "Success", "Result", "Error"} dict per input, in input order.
+    def bulk_create_tenants(self, items, max_workers=8):
+        return self._bulk(self.create_tenant, items, max_workers)
+
+    def bulk_get_tenants(self, tenant_ids, max_workers=8):
+        return self._bulk(self.get_tenant, tenant_ids, max_workers)
+
+    def bulk_exists_tenants(self, tenant_ids, max_workers=8):
+        return self._bulk(self.tenant_exists, tenant_ids, max_workers)
+
+    def bulk_create_users(self, items, max_workers=8):
+        return self._bulk(self.create_user, items, max_workers)
+
+    def bulk_get_users(self, user_ids, max_workers=8):
+        return self._bulk(self.get_user, user_ids, max_workers)
+
+    def bulk_exists_users(self, user_ids, max_workers=8):
+        return self._bulk(self.user_exists, user_ids, max_workers)
+
+    def bulk_create_credentials(self, items, max_workers=8):
+        return self._bulk(self.create_credential, items, max_workers)
+
+    def bulk_get_credentials(self, credential_ids, max_workers=8):
+        return self._bulk(self.get_credential, credential_ids, max_workers)
+
+    def bulk_exists_credentials(self, credential_ids, max_workers=8):
+        return self._bulk(self.credential_exists, credential_ids, max_workers)
+
+    def bulk_create_endpoints(self, items, max_workers=8):
+        return self._bulk(self.create_endpoint, items, max_workers)
+
+    def bulk_get_endpoints(self, endpoint_ids, max_workers=8):
+        return self._bulk(self.get_endpoint, endpoint_ids, max_workers)
+
+    def bulk_exists_endpoints(self, endpoint_ids, max_workers=8):
+        return self._bulk(self.endpoint_exists, endpoint_ids, max_workers)
+
+    def bulk_create_completion_endpoints(self, items, max_workers=8):
+        return self._bulk(self.create_completion_endpoint, items, max_workers)
+
+    def bulk_get_completion_endpoints(self, endpoint_ids, max_workers=8):
+        return self._bulk(self.get_completion_endpoint, endpoint_ids, max_workers)
+
+    def bulk_exists_completion_endpoints(self, endpoint_ids, max_workers=8):
+        return self._bulk(self.completion_endpoint_exists, endpoint_ids, max_workers)
+
     # Request History
     def get_request_history(self, entry_id):
         return self._request("GET", f"/v1.0/requests/{entry_id}")
@@ -225,4 +610,1120 @@ class PartioClient:
         return self._request("DELETE", f"/v1.0/requests/{entry_id}")
 
     def enumerate_request_history(self, req=None):
-        return self._request("POST", "/v1.0/requests/enumerate", req or {})
+        return self._request("POST", "/v1.0/requests/enumerate", req or {}, EnumerationResult)
+
+    def iter_request_history(self, req=None):
+        """Yield request history entries, following continuation tokens across pages."""
+        page_req = dict(req or {})
+        while True:
+            page = self.enumerate_request_history(page_req) or {}
+            for entry in page.get("Data") or []:
+                yield entry
+            token = page.get("ContinuationToken")
+            if not page.get("HasMore") or not token:
+                return
+            page_req["ContinuationToken"] = token
+
+    def get_request_history_details(self, entry_ids, max_workers=8):
+        """Fetch request history detail for many entries concurrently.
+
+        Returns one {"Item", "Success", "Result", "Error"} dict per entry ID, in
+        input order, like the bulk_* methods.
+        """
+        return self._bulk(self.get_request_history_detail, entry_ids, max_workers)
+
+    def get_request_statistics(self, request_type=None, timeframe="Day", endpoint_filter=None):
+        """Get time-bucketed success/failure counts for request history.
+
+        request_type is "Embedding", "Inference", or None for all requests;
+        timeframe is "Hour", "Day", "Week", or "Month".
+        """
+        return self._request("POST", "/v1.0/requests/statistics", {
+            "RequestType": request_type,
+            "Timeframe": timeframe,
+            "EndpointFilter": endpoint_filter,
+        }, RequestStatisticsResponse)
+
+
+def _run_concurrent(fn, items, max_workers=8):
+    """Call fn(item) for every item with bounded parallelism.
+
+    Returns a list of (item, result, error) tuples in input order; error is the
+    PartioError or requests exception raised for that item, or None on success.
+    """
+    items = list(items)
+    if max_workers < 1:
+        raise ValueError("max_workers must be >= 1")
+
+    def call(item):
+        try:
+            return item, fn(item), None
+        except (PartioError, requests.RequestException) as ex:
+            return item, None, ex
+
+    if not items:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        return list(executor.map(call, items))
+
+
+# Request History Analytics
+
+_ID_SEGMENT = re.compile(r"^[a-z]+_[A-Za-z0-9]{16,}$")
+_GEMINI_MODEL = re.compile(r"/models/([^/:]+)")
+_MODEL_PURPOSES = ("EmbeddingRequest", "CompletionRequest")
+
+
+def analyze_request_history(client, req=None, max_entries=None, max_workers=8):
+    """Summarize where time goes across request history entries.
+
+    Walks enumerate_request_history (optionally capped at max_entries), fetches
+    each entry's detail concurrently, and returns a dict with latency
+    distributions per endpoint, per upstream call purpose, and per upstream
+    model, the upstream vs. Partio share of response time, and retry and 429
+    rates.
+
+    Only embedding and completion calls count toward the per-model latencies;
+    capability and tokenization probes are reported under Purposes instead. A
+    call counts as a retry when it repeats the purpose and request body of an
+    earlier failed call in the same entry.
+    """
+    entries = []
+    for entry in client.iter_request_history(req):
+        entries.append(entry)
+        if max_entries is not None and len(entries) >= max_entries:
+            break
+
+    details = {r["Item"]: r for r in client.get_request_history_details([e["Id"] for e in entries], max_workers)}
+
+    by_endpoint = {}
+    by_purpose = {}
+    by_model = {}
+    total_ms = 0.0
+    upstream_ms = 0.0
+    total_calls = 0
+    retried_calls = 0
+    throttled_calls = 0
+    throttled_entries = 0
+    failed_details = 0
+
+    for entry in entries:
+        response_ms = entry.get("ResponseTimeMs")
+        if entry.get("HttpStatus") == 429:
+            throttled_entries += 1
+        if response_ms is not None:
+            by_endpoint.setdefault(_endpoint_key(entry), []).append(response_ms)
+
+        record = details[entry["Id"]]
+        if not record["Success"]:
+            failed_details += 1
+            continue
+        detail = record["Result"] or {}
+
+        calls = (detail.get("EmbeddingCalls") or []) + (detail.get("CompletionCalls") or [])
+        entry_upstream_ms = 0.0
+        failed_calls = set()
+        for call in calls:
+            total_calls += 1
+            # Completion calls carry no purpose; embedding calls say whether they are real requests or probes.
+            purpose = call.get("Purpose") or "CompletionRequest"
+            call_ms = call.get("ResponseTimeMs")
+            if call_ms is not None:
+                entry_upstream_ms += call_ms
+                by_purpose.setdefault(purpose, []).append(call_ms)
+                if purpose in _MODEL_PURPOSES:
+                    by_model.setdefault(_call_model(call), []).append(call_ms)
+            if call.get("StatusCode") == 429:
+                throttled_calls += 1
+            call_key = (purpose, call.get("Url"), call.get("RequestBody"))
+            if call_key in failed_calls:
+                retried_calls += 1
+            if not call.get("Success"):
+                failed_calls.add(call_key)
+
+        if response_ms is not None:
+            # Upstream calls can overlap, so never attribute more than the wall-clock time upstream.
+            total_ms += response_ms
+            upstream_ms += min(entry_upstream_ms, response_ms)
+
+    return {
+        "EntryCount": len(entries),
+        "DetailFailures": failed_details,
+        "UpstreamCallCount": total_calls,
+        "Endpoints": {key: _latency_summary(values) for key, values in sorted(by_endpoint.items())},
+        "Purposes": {key: _latency_summary(values) for key, values in sorted(by_purpose.items())},
+        "Models": {key: _latency_summary(values) for key, values in sorted(by_model.items())},
+        "TotalResponseTimeMs": round(total_ms, 2),
+        "UpstreamTimeMs": round(upstream_ms, 2),
+        "PartioTimeMs": round(total_ms - upstream_ms, 2),
+        "UpstreamShare": _ratio(upstream_ms, total_ms),
+        "RetryRate": _ratio(retried_calls, total_calls),
+        "UpstreamThrottleRate": _ratio(throttled_calls, total_calls),
+        "ThrottleRate": _ratio(throttled_entries, len(entries)),
+    }
+
+
+def _endpoint_key(entry):
+    path = urlparse(entry.get("HttpUrl") or "").path
+    segments = ["{id}" if _ID_SEGMENT.match(s) else s for s in path.split("/")]
+    return f"{entry.get('HttpMethod') or '?'} {'/'.join(segments)}"
+
+
+def _call_model(call):
+    body = call.get("RequestBody")
+    if body:
+        try:
+            model = json.loads(body).get("model")
+            if model:
+                return model
+        except (ValueError, AttributeError):
+            pass
+    match = _GEMINI_MODEL.search(call.get("Url") or "")
+    return match.group(1) if match else "unknown"
+
+
+def _percentile(ordered, pct):
+    rank = math.ceil(pct / 100.0 * len(ordered))
+    return ordered[max(0, min(len(ordered), rank) - 1)]
+
+
+def _latency_summary(values):
+    ordered = sorted(values)
+    return {
+        "Count": len(ordered),
+        "MinMs": ordered[0],
+        "MeanMs": round(sum(ordered) / len(ordered), 2),
+        "P50Ms": _percentile(ordered, 50),
+        "P90Ms": _percentile(ordered, 90),
+        "P99Ms": _percentile(ordered, 99),
+        "MaxMs": ordered[-1],
+    }
+
+
+def _ratio(numerator, denominator):
+    return round(numerator / denominator, 4) if denominator else 0.0
+
+
+# Throughput Autotuning
+
+DEFAULT_AUTOTUNE_PATH = os.path.join(os.path.expanduser("~"), ".partio", "autotune.json")
+
+
+def autotune(client, endpoint_id, sample_cells, batch_sizes=(1, 4, 16), concurrency_levels=(1, 2, 4),
+             token_counts=None, requests_per_trial=8, max_throttle_rate=0.0, store_path=DEFAULT_AUTOTUNE_PATH):
+    """Measure process_batch throughput for an embedding endpoint and recommend settings.
+
+    Runs one bounded trial per combination of batch size, concurrency, and
+    FixedTokenCount (token_counts=None keeps the cells' own budget), each
+    issuing requests_per_trial batches built from sample_cells. Every trial
+    records cells/sec, chunks/sec, p99 latency, and the 429 rate. Trials are
+    ranked by cells/sec rather than chunks/sec, because a smaller
+    FixedTokenCount yields more chunks from the same input without doing the
+    work any faster. The recommendation is the highest-throughput
+    Pareto-optimal trial whose 429 rate does not exceed max_throttle_rate.
+    One untimed request warms the endpoint's model before the sweep. The
+    result is persisted under endpoint_id in store_path unless store_path is
+    None.
+    """
+    sample_cells = list(sample_cells)
+    if not sample_cells:
+        raise ValueError("sample_cells must not be empty")
+    if requests_per_trial < 1:
+        raise ValueError("requests_per_trial must be >= 1")
+
+    try:
+        client.process(_prepare_cell(sample_cells[0], endpoint_id, None))
+    except (PartioError, requests.RequestException):
+        pass  # a failing endpoint shows up in the trial error rates
+
+    trials = []
+    for token_count in (token_counts or [None]):
+        for batch_size in batch_sizes:
+            for concurrency in concurrency_levels:
+                trials.append(_run_autotune_trial(
+                    client, endpoint_id, sample_cells, batch_size, concurrency, token_count, requests_per_trial))
+
+    front = [t for t in trials if not any(_dominates(o, t) for o in trials)]
+    eligible = [t for t in front if t["ErrorRate"] == 0 and t["ThrottleRate"] <= max_throttle_rate]
+    if eligible:
+        best = max(eligible, key=lambda t: (t["CellsPerSecond"], -t["P99Ms"]))
+    else:
+        best = min(front, key=lambda t: (t["ErrorRate"] + t["ThrottleRate"], -t["CellsPerSecond"]))
+
+    result = {
+        "EndpointId": endpoint_id,
+        "TunedUtc": datetime.now(timezone.utc).isoformat(),
+        "Recommended": {
+            "BatchSize": best["BatchSize"],
+            "Concurrency": best["Concurrency"],
+            "FixedTokenCount": best["FixedTokenCount"],
+        },
+        "ParetoFront": front,
+        "Trials": trials,
+    }
+    if store_path:
+        save_autotune_result(result, store_path)
+    return result
+
+
+def save_autotune_result(result, path=DEFAULT_AUTOTUNE_PATH):
+    """Persist an autotune result, replacing any earlier result for the same endpoint."""
+    results = _read_autotune_file(path)
+    results[result["EndpointId"]] = result
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def load_autotune_result(endpoint_id, path=DEFAULT_AUTOTUNE_PATH):
+    """Return the persisted autotune result for endpoint_id, or None."""
+    return _read_autotune_file(path).get(endpoint_id)
+
+
+def process_batch_tuned(client, endpoint_id, cells, settings=None, store_path=DEFAULT_AUTOTUNE_PATH):
+    """Process cells through process_batch using autotuned settings.
+
+    settings defaults to the persisted recommendation for endpoint_id. Cells are
+    sent in batches of the recommended size with the recommended concurrency,
+    and responses are returned in input order.
+    """
+    if settings is None:
+        stored = load_autotune_result(endpoint_id, store_path)
+        if stored is None:
+            raise ValueError(f"No autotune result stored for endpoint {endpoint_id}")
+        settings = stored["Recommended"]
+
+    cells = [_prepare_cell(cell, endpoint_id, settings.get("FixedTokenCount")) for cell in cells]
+    batch_size = settings["BatchSize"]
+    batches = [cells[i:i + batch_size] for i in range(0, len(cells), batch_size)]
+
+    responses = []
+    for _, result, error in _run_concurrent(client.process_batch, batches, settings["Concurrency"]):
+        if error is not None:
+            raise error
+        responses.extend(result or [])
+    return responses
+
+
+def _run_autotune_trial(client, endpoint_id, sample_cells, batch_size, concurrency, token_count, request_count):
+    cells = [_prepare_cell(cell, endpoint_id, token_count) for cell in sample_cells]
+    batches = [[cells[(r * batch_size + i) % len(cells)] for i in range(batch_size)] for r in range(request_count)]
+    latencies = []
+
+    def timed_batch(batch):
+        start = time.perf_counter()
+        try:
+            return client.process_batch(batch)
+        finally:
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    outcomes = _run_concurrent(timed_batch, batches, concurrency)
+    elapsed = time.perf_counter() - start
+
+    responses = [response for _, result, error in outcomes if error is None for response in result or []]
+    chunks = sum(_count_chunks(response) for response in responses)
+    statuses = [getattr(error, "status_code", None) for _, _, error in outcomes if error is not None]
+    throttled = statuses.count(429)
+    errors = len(statuses) - throttled
+    ordered = sorted(latencies)
+    return {
+        "BatchSize": batch_size,
+        "Concurrency": concurrency,
+        "FixedTokenCount": token_count,
+        "Requests": request_count,
+        "Cells": len(responses),
+        "Chunks": chunks,
+        "CellsPerSecond": round(len(responses) / elapsed, 2) if elapsed > 0 else 0.0,
+        "ChunksPerSecond": round(chunks / elapsed, 2) if elapsed > 0 else 0.0,
+        "P99Ms": round(_percentile(ordered, 99), 2),
+        "ThrottleRate": _ratio(throttled, request_count),
+        "ErrorRate": _ratio(errors, request_count),
+    }
+
+
+def _prepare_cell(cell, endpoint_id, token_count):
+    cell = copy.deepcopy(cell)
+    embedding = cell.setdefault("EmbeddingConfiguration", {})
+    embedding["EmbeddingEndpointId"] = endpoint_id
+    if token_count is not None:
+        chunking = cell.setdefault("ChunkingConfiguration", {})
+        if chunking.get("Strategy", "FixedTokenCount") == "FixedTokenCount":
+            chunking["FixedTokenCount"] = token_count
+    return cell
+
+
+def _count_chunks(response):
+    if not isinstance(response, Mapping):
+        return 0
+    return len(response.get("Chunks") or []) + sum(_count_chunks(child) for child in response.get("Children") or [])
+
+
+def _dominates(a, b):
+    """True when trial a is at least as good as b on every objective and better on one."""
+    a_key = (a["CellsPerSecond"], -a["P99Ms"], -a["ThrottleRate"], -a["ErrorRate"])
+    b_key = (b["CellsPerSecond"], -b["P99Ms"], -b["ThrottleRate"], -b["ErrorRate"])
+    return all(x >= y for x, y in zip(a_key, b_key)) and a_key != b_key
+
+
+def _read_autotune_file(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+# Client-side Tokenization
+
+DEFAULT_MAX_CELL_TOKENS = 32768
+DEFAULT_BERT_VOCAB_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "..", "..", "src", "Partio.Core", "Tokenization", "Data", "bert-base-uncased-vocab.txt")
+
+_SPLITTABLE_TYPES = ("Text", "Code")
+_BERT_WORD = re.compile(r"[^\W_]+|\S")
+_CJK = re.compile("([\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\U00020000-\U0002fa1f])")
+
+
+class Cl100kTokenizer:
+    """cl100k_base tokenizer backed by the optional tiktoken package."""
+
+    kind = "Cl100kBase"
+
+    def __init__(self):
+        try:
+            import tiktoken
+        except ImportError as ex:
+            raise ImportError("Cl100kBase tokenization requires tiktoken (pip install tiktoken)") from ex
+        self._encoding = tiktoken.get_encoding("cl100k_base")
+
+    def upper_bound(self, text):
+        # Every cl100k token covers at least one UTF-8 byte.
+        return len(text.encode("utf-8"))
+
+    def count_tokens(self, text):
+        if not text:
+            return 0
+        return len(self._encoding.encode(text, disallowed_special=()))
+
+    def token_end_offsets(self, text):
+        """Return the character offset at which each token ends."""
+        if not text:
+            return []
+        tokens = self._encoding.encode(text, disallowed_special=())
+        _, starts = self._encoding.decode_with_offsets(tokens)
+        return [max(start, 1) for start in starts[1:]] + [len(text)]
+
+
+class BertWordPieceTokenizer:
+    """Uncased BERT WordPiece tokenizer using the vocabulary shipped with the Partio server.
+
+    Counts exclude the [CLS] and [SEP] markers; reserve room for them with the
+    endpoint's ReservedInputTokens.
+    """
+
+    kind = "BertWordPiece"
+
+    def __init__(self, vocab_path=DEFAULT_BERT_VOCAB_PATH, max_word_chars=100):
+        with open(vocab_path, "r", encoding="utf-8") as f:
+            self._vocab = frozenset(line.rstrip("\n") for line in f)
+        self._max_word_chars = max_word_chars
+        self._word_cache = {}
+
+    def upper_bound(self, text):
+        # Every normalized character yields at most one token, and lowercasing and
+        # NFD can expand a character (a Hangul syllable decomposes into 2-3 jamo).
+        if text.isascii():
+            return len(text)
+        return len(unicodedata.normalize("NFD", text.lower()))
+
+    def count_tokens(self, text):
+        if not text:
+            return 0
+        return sum(len(self._piece_ends(m.group())) for m in _BERT_WORD.finditer(text))
+
+    def token_end_offsets(self, text):
+        """Return the character offset at which each WordPiece token ends."""
+        offsets = []
+        for match in _BERT_WORD.finditer(text or ""):
+            offsets.extend(match.start() + end for end in self._piece_ends(match.group()))
+        return offsets
+
+    def _piece_ends(self, word):
+        """Return the end offset within word of each of its tokens."""
+        ends = self._word_cache.get(word)
+        if ends is not None:
+            return ends
+
+        # Normalize per character so every normalized character maps back to the original word.
+        normalized = []
+        origins = []
+        for i, c in enumerate(word):
+            n = self._normalize(c)
+            normalized.append(n)
+            origins.extend([i + 1] * len(n))
+        normalized = "".join(normalized)
+
+        ends = []
+        start = 0
+        for segment in _CJK.split(normalized):
+            if segment:
+                ends.extend(origins[start + end - 1] for end in self._wordpiece_ends(segment))
+            start += len(segment)
+        ends = tuple(ends)
+        if len(self._word_cache) < 100000:
+            self._word_cache[word] = ends
+        return ends
+
+    @staticmethod
+    def _normalize(word):
+        word = unicodedata.normalize("NFD", word.lower())
+        return "".join(c for c in word if unicodedata.category(c) != "Mn")
+
+    def _wordpiece_ends(self, word):
+        if len(word) > self._max_word_chars:
+            return [len(word)]
+        ends = []
+        start = 0
+        while start < len(word):
+            end = len(word)
+            while end > start:
+                piece = word[start:end] if start == 0 else "##" + word[start:end]
+                if piece in self._vocab:
+                    break
+                end -= 1
+            if end == start:
+                return [len(word)]  # [UNK] replaces the whole word
+            ends.append(end)
+            start = end
+        return ends
+
+
+_TOKENIZERS = {}
+
+
+def get_tokenizer(kind="Cl100kBase", vocab_path=DEFAULT_BERT_VOCAB_PATH):
+    """Return a cached tokenizer for a TokenizerKind value ("Cl100kBase" or "BertWordPiece")."""
+    key = (kind, vocab_path if kind == "BertWordPiece" else None)
+    tokenizer = _TOKENIZERS.get(key)
+    if tokenizer is None:
+        if kind == "Cl100kBase":
+            tokenizer = Cl100kTokenizer()
+        elif kind == "BertWordPiece":
+            tokenizer = BertWordPieceTokenizer(vocab_path)
+        else:
+            raise ValueError(f"Unsupported TokenizerKind: {kind}")
+        _TOKENIZERS[key] = tokenizer
+    return tokenizer
+
+
+def tokenizer_for_endpoint(source, vocab_path=DEFAULT_BERT_VOCAB_PATH):
+    """Return the tokenizer an embedding endpoint uses on the server.
+
+    source is a resolved TokenizationProfile, a response carrying one
+    (explore_embedding_endpoint, embed), or an embedding endpoint. For an
+    endpoint, an explicit Tokenization.TokenizerKind wins; otherwise the
+    server's provider defaults are mirrored when AutoDetect is off, and a
+    ValueError is raised when AutoDetect is on, since the server then probes
+    the provider and only a resolved profile is authoritative.
+    """
+    return get_tokenizer(_tokenization_setting(source, "TokenizerKind"), vocab_path)
+
+
+def input_token_budget(source):
+    """Return the per-input token budget the server applies to an embedding endpoint.
+
+    Accepts the same sources as tokenizer_for_endpoint and raises ValueError
+    in the same cases.
+    """
+    profile = _resolved_profile(source)
+    if profile is not None:
+        return profile.get("EffectiveInputBudget")
+    tokenization = source.get("Tokenization") or {}
+    if tokenization.get("EffectiveInputBudget"):
+        return tokenization["EffectiveInputBudget"]
+    max_input_tokens = _tokenization_setting(source, "MaxInputTokens")
+    reserved = tokenization.get("ReservedInputTokens")
+    if reserved is None:
+        reserved = _provider_tokenization_defaults(source)["ReservedInputTokens"]
+    return max(1, max_input_tokens - reserved)
+
+
+# Mirrors TokenizationDefaultsSettings and TokenizationProfileResolver.ResolveProviderDefaults.
+_PROVIDER_TOKENIZATION_DEFAULTS = {
+    "OpenAI": {"TokenizerKind": "Cl100kBase", "MaxInputTokens": 8192, "ReservedInputTokens": 0},
+    "vLLM": {"TokenizerKind": "Cl100kBase", "MaxInputTokens": 8192, "ReservedInputTokens": 0},
+    "Gemini": {"TokenizerKind": "Cl100kBase", "MaxInputTokens": 2048, "ReservedInputTokens": 0},
+}
+_GLOBAL_TOKENIZATION_DEFAULTS = {"TokenizerKind": "Cl100kBase", "MaxInputTokens": 8192, "ReservedInputTokens": 0}
+_BERT_TOKENIZATION_DEFAULTS = {"TokenizerKind": "BertWordPiece", "MaxInputTokens": 512, "ReservedInputTokens": 8}
+_BERT_LIKE_MODELS = ("bert", "minilm", "e5", "gte", "bge")
+
+
+def _resolved_profile(source):
+    if source is None:
+        raise ValueError("A TokenizationProfile or embedding endpoint is required")
+    if "TokenizationProfile" in source:
+        return source.get("TokenizationProfile") or {}
+    if "ProfileSource" in source:
+        return source
+    return None
+
+
+def _tokenization_setting(source, key):
+    profile = _resolved_profile(source)
+    if profile is not None:
+        if not profile.get(key):
+            raise ValueError(f"TokenizationProfile has no {key}")
+        return profile[key]
+    tokenization = source.get("Tokenization") or {}
+    if tokenization.get(key):
+        return tokenization[key]
+    if tokenization.get("AutoDetect", True):
+        raise ValueError(
+            f"Embedding endpoint {source.get('Id')} auto-detects {key}; pass the "
+            "TokenizationProfile from explore_embedding_endpoint or an embed response instead")
+    return _provider_tokenization_defaults(source)[key]
+
+
+def _provider_tokenization_defaults(source):
+    api_format = source.get("ApiFormat") or "Ollama"
+    if api_format in _PROVIDER_TOKENIZATION_DEFAULTS:
+        return _PROVIDER_TOKENIZATION_DEFAULTS[api_format]
+    model = (source.get("Model") or "").lower()
+    if api_format == "Ollama" and any(name in model for name in _BERT_LIKE_MODELS):
+        return _BERT_TOKENIZATION_DEFAULTS
+    return _GLOBAL_TOKENIZATION_DEFAULTS
+
+
+def split_text(text, max_tokens, tokenizer):
+    """Split text into pieces of at most max_tokens tokens.
+
+    Pieces break at the last paragraph, line, or whitespace boundary in the
+    back half of each window, and at a token boundary otherwise.
+    """
+    if max_tokens < 1:
+        raise ValueError("max_tokens must be >= 1")
+    if not text or tokenizer.upper_bound(text) <= max_tokens:
+        return [text] if text else []
+
+    ends = tokenizer.token_end_offsets(text)
+    if len(ends) <= max_tokens:
+        return [text]
+
+    pieces = []
+    start = 0
+    token_index = 0
+    while token_index + max_tokens < len(ends):
+        window_end = token_index + max_tokens
+        limit = ends[window_end - 1]
+        if ends[window_end] == limit:
+            # One character produced tokens on both sides of the window; cut before it.
+            previous = window_end - 1
+            while previous > token_index and ends[previous] == limit:
+                previous -= 1
+            if ends[previous] < limit:
+                limit = ends[previous]
+        cut = _boundary(text, start, limit)
+        pieces.append(text[start:cut])
+        start = cut
+        while token_index < len(ends) and ends[token_index] <= cut:
+            token_index += 1
+    if start < len(text):
+        pieces.append(text[start:])
+    return [piece for piece in pieces if piece.strip()]
+
+
+def _boundary(text, start, limit):
+    floor = start + (limit - start) // 2
+    for separator in ("\n\n", "\n", " "):
+        index = text.rfind(separator, floor, limit)
+        if index > start:
+            return index + len(separator)
+    return limit
+
+
+def presplit_cells(cells, tokenizer, max_cell_tokens=DEFAULT_MAX_CELL_TOKENS):
+    """Split oversized Text and Code cells into several cells of at most max_cell_tokens.
+
+    Split cells keep every other field (configuration, Labels, Tags) but drop
+    GUID so the server assigns a fresh one to each piece.
+    """
+    result = []
+    for cell in cells:
+        text = cell.get("Text")
+        if cell.get("Type", "Text") not in _SPLITTABLE_TYPES or not text or cell.get("Children"):
+            result.append(cell)
+            continue
+        pieces = split_text(text, max_cell_tokens, tokenizer)
+        if len(pieces) <= 1:
+            result.append(cell)
+            continue
+        for piece in pieces:
+            split_cell = {k: v for k, v in cell.items() if k not in ("GUID", "Text")}
+            split_cell["Text"] = piece
+            result.append(split_cell)
+    return result
+
+
+def count_cell_tokens(cell, tokenizer):
+    """Count the tokens in a SemanticCellRequest's content, including its children."""
+    total = 0
+    for key in ("Text", "UnorderedList", "OrderedList", "Table"):
+        value = cell.get(key)
+        if isinstance(value, str):
+            total += tokenizer.count_tokens(value)
+        elif value:
+            rows = value if key == "Table" else [value]
+            total += sum(tokenizer.count_tokens(item or "") for row in rows for item in row)
+    return total + sum(count_cell_tokens(child, tokenizer) for child in cell.get("Children") or [])
+
+
+def batch_cells_by_tokens(cells, tokenizer, max_request_tokens, max_batch_size=None):
+    """Group cells into process_batch payloads that stay within max_request_tokens.
+
+    A single cell larger than max_request_tokens is sent on its own; run
+    presplit_cells first to avoid that.
+    """
+    batch = []
+    batch_tokens = 0
+    for cell in cells:
+        tokens = count_cell_tokens(cell, tokenizer)
+        full = max_batch_size is not None and len(batch) >= max_batch_size
+        if batch and (full or batch_tokens + tokens > max_request_tokens):
+            yield batch
+            batch = []
+            batch_tokens = 0
+        batch.append(cell)
+        batch_tokens += tokens
+    if batch:
+        yield batch
+
+
+# Vector Utilities
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError as ex:
+        raise ImportError("Vector utilities require numpy (pip install numpy)") from ex
+    return numpy
+
+
+def collect_embeddings(results):
+    """Gather vectors from embed or process/process_batch results into a float32 matrix.
+
+    Accepts one result or a list of results. Returns (matrix, sources), where
+    sources[i] is the chunk dict that produced row i, or (result, index) for
+    embed results. Chunks from nested Children are included; chunks without
+    embeddings are skipped.
+    """
+    np = _numpy()
+    if isinstance(results, Mapping):
+        results = [results]
+    vectors = []
+    sources = []
+
+    def visit(cell):
+        for chunk in cell.get("Chunks") or []:
+            if chunk.get("Embeddings"):
+                vectors.append(chunk["Embeddings"])
+                sources.append(chunk)
+        for child in cell.get("Children") or []:
+            visit(child)
+
+    for result in results:
+        if "Chunks" in result or "Children" in result:
+            visit(result)
+        else:
+            for i, vector in enumerate(result.get("Embeddings") or []):
+                vectors.append(vector)
+                sources.append((result, i))
+    if not vectors:
+        return np.empty((0, 0), dtype=np.float32), sources
+    return np.asarray(vectors, dtype=np.float32), sources
+
+
+def l2_normalize(vectors):
+    """Return a row-wise L2-normalized float32 copy of vectors; zero rows stay zero."""
+    np = _numpy()
+    matrix = np.array(vectors, dtype=np.float32, ndmin=2)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def top_k(queries, vectors, k=10, metric="cosine", block_size=4096):
+    """Find the k most similar rows of vectors for each query.
+
+    metric is "cosine" or "dot". Scores are computed one block of vectors at a
+    time so memory stays bounded. Returns (indices, scores) arrays of shape
+    (len(queries), k) sorted best first.
+    """
+    np = _numpy()
+    queries = _prepare_vectors(queries, metric)
+    vectors = _prepare_vectors(vectors, metric)
+    # An empty list prepares to a (1, 0) array, which holds no vectors.
+    k = min(k, len(vectors)) if vectors.size else 0
+    if k < 1:
+        return np.empty((len(queries), 0), dtype=np.int64), np.empty((len(queries), 0), dtype=np.float32)
+    best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+    best_indices = np.empty((len(queries), 0), dtype=np.int64)
+
+    for start in range(0, len(vectors), block_size):
+        scores = queries @ vectors[start:start + block_size].T
+        indices = np.broadcast_to(np.arange(start, start + scores.shape[1]), scores.shape)
+        scores = np.concatenate([best_scores, scores], axis=1)
+        indices = np.concatenate([best_indices, indices], axis=1)
+        if scores.shape[1] > k:
+            keep = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            scores = np.take_along_axis(scores, keep, axis=1)
+            indices = np.take_along_axis(indices, keep, axis=1)
+        best_scores, best_indices = scores, indices
+
+    order = np.argsort(-best_scores, axis=1)
+    return np.take_along_axis(best_indices, order, axis=1), np.take_along_axis(best_scores, order, axis=1)
+
+
+def find_near_duplicates(vectors, threshold=0.95, block_size=1024, index=None):
+    """Return (i, j, similarity) for every pair i < j with cosine similarity >= threshold.
+
+    Exact search compares blocks of rows against the upper triangle with one
+    matrix multiply per block. Pass an LshIndex built over the same vectors to
+    compare only rows that share a hash bucket, which is approximate but far
+    cheaper on large sets.
+    """
+    np = _numpy()
+    matrix = l2_normalize(vectors)
+    if index is not None:
+        return index.near_duplicates(matrix, threshold, block_size)
+
+    pairs = []
+    for start in range(0, len(matrix), block_size):
+        block = matrix[start:start + block_size]
+        scores = block @ matrix[start:].T
+        rows, cols = np.nonzero(np.triu(np.ones(scores.shape, dtype=bool), k=1) & (scores >= threshold))
+        pairs.extend(zip((rows + start).tolist(), (cols + start).tolist(), scores[rows, cols].tolist()))
+    return sorted(pairs)
+
+
+def deduplicate(vectors, threshold=0.95, block_size=1024, index=None):
+    """Return the row indices to keep so that no two kept rows are near duplicates.
+
+    The first row of each duplicate group is kept.
+    """
+    dropped = set()
+    for i, j, _ in find_near_duplicates(vectors, threshold, block_size, index):
+        if i not in dropped:
+            dropped.add(j)
+    return [i for i in range(len(vectors)) if i not in dropped]
+
+
+class LshIndex:
+    """Random-hyperplane LSH index for approximate cosine near-duplicate search.
+
+    Each of num_tables tables hashes a vector to num_bits sign bits; vectors
+    sharing a bucket in any table become candidates and are then scored
+    exactly. More bits mean smaller buckets (faster, more misses); more tables
+    recover misses.
+    """
+
+    def __init__(self, vectors, num_bits=16, num_tables=4, seed=0):
+        np = _numpy()
+        matrix = l2_normalize(vectors)
+        self.row_count = len(matrix)
+        rng = np.random.default_rng(seed)
+        planes = rng.standard_normal((num_tables, num_bits, matrix.shape[1])).astype(np.float32)
+        weights = (1 << np.arange(num_bits, dtype=np.int64))
+        self.buckets = []
+        for table in planes:
+            codes = ((matrix @ table.T) > 0).astype(np.int64) @ weights
+            buckets = {}
+            for row, code in enumerate(codes.tolist()):
+                buckets.setdefault(code, []).append(row)
+            self.buckets.append([rows for rows in buckets.values() if len(rows) > 1])
+
+    def near_duplicates(self, matrix, threshold, block_size=1024):
+        np = _numpy()
+        if len(matrix) != self.row_count:
+            raise ValueError(f"LshIndex was built over {self.row_count} vectors but {len(matrix)} were given")
+        found = {}
+        for table in self.buckets:
+            for rows in table:
+                members = np.asarray(rows)
+                for start in range(0, len(members), block_size):
+                    block = members[start:start + block_size]
+                    scores = matrix[block] @ matrix[members[start:]].T
+                    r, c = np.nonzero(np.triu(np.ones(scores.shape, dtype=bool), k=1) & (scores >= threshold))
+                    for i, j, score in zip(block[r].tolist(), members[start:][c].tolist(), scores[r, c].tolist()):
+                        found[(min(i, j), max(i, j))] = score
+        return sorted((i, j, score) for (i, j), score in found.items())
+
+
+def _prepare_vectors(vectors, metric):
+    np = _numpy()
+    if metric == "cosine":
+        return l2_normalize(vectors)
+    if metric == "dot":
+        return np.array(vectors, dtype=np.float32, ndmin=2)
+    raise ValueError(f"Unsupported metric: {metric}")
+
+
+# JSONL Ingestion
+
+_ingest_client = None
+
+
+def ingest(endpoint, access_key, inputs, output, workers=None, batch_size=32, embedding_endpoint_id=None,
+           checkpoint_path=None, resume=True, progress_interval=5.0, progress_stream=sys.stderr,
+           max_retries=4, retry_backoff=1.0):
+    """Stream SemanticCellRequest JSONL files through process_batch using worker processes.
+
+    Each worker process owns a PartioClient and does the JSON decoding, the
+    request, and the JSON encoding of results, so throughput scales with
+    cores. Responses are appended to output as JSONL in input order.
+
+    Requests rejected with 429 or 5xx, or failing with a connection error or
+    timeout, are retried up to max_retries times with jittered exponential
+    backoff starting at retry_backoff seconds. A batch rejected with 400 is
+    retried one cell at a time so a single bad record does not fail the
+    rest. Cells that still fail, and lines that are not JSON objects, are
+    written with their error to output + ".errors".
+
+    After every batch the per-file byte offsets (and output sizes) are saved
+    to the checkpoint, so a rerun resumes where the last run stopped without
+    duplicating output. Resuming raises ValueError if the output or errors
+    file is shorter than the checkpoint records. Returns a summary dict.
+    """
+    workers = workers or os.cpu_count() or 1
+    error_path = output + ".errors"
+    checkpoint_path = checkpoint_path or output + ".checkpoint.json"
+    inputs = [os.path.abspath(path) for path in inputs]
+
+    state = {"Files": {}, "OutputBytes": 0, "ErrorBytes": 0, "Cells": 0, "Chunks": 0, "Errors": 0}
+    if resume and os.path.exists(checkpoint_path):
+        with open(checkpoint_path, "r", encoding="utf-8") as f:
+            state.update(json.load(f))
+        # Truncating a file that is shorter than the checkpoint would pad it with NUL bytes.
+        for path, expected in ((output, state["OutputBytes"]), (error_path, state["ErrorBytes"])):
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            if size < expected:
+                raise ValueError(
+                    f"{path} has {size} bytes but checkpoint {checkpoint_path} expects at least {expected}; "
+                    "restart the ingest (--restart or resume=False)")
+    else:
+        for path in (output, error_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    total_bytes = sum(os.path.getsize(path) for path in inputs)
+    start_bytes = sum(state["Files"].get(path, 0) for path in inputs)
+    progress = {"Start": time.monotonic(), "Last": time.monotonic(), "StartBytes": start_bytes, "StartCells": state["Cells"]}
+
+    with open(output, "ab") as out, open(error_path, "ab") as err:
+        # Drop anything written after the last checkpoint so resumed output has no duplicates.
+        out.truncate(state["OutputBytes"])
+        err.truncate(state["ErrorBytes"])
+        out.seek(0, os.SEEK_END)
+        err.seek(0, os.SEEK_END)
+
+        def complete(path, end_offset, lines, future):
+            try:
+                results, errors, cells, chunks = future.result()
+            except BrokenProcessPool:
+                raise  # every later batch would fail too; stop and let a rerun resume
+            except Exception as ex:
+                results, cells, chunks = b"", 0, 0
+                errors = "".join(
+                    json.dumps({"Line": line.decode("utf-8", "replace").rstrip("\n"), "Error": f"Worker failed: {ex!r}"}) + "\n"
+                    for line in lines).encode("utf-8")
+            out.write(results)
+            err.write(errors)
+            out.flush()
+            err.flush()
+            state["Files"][path] = end_offset
+            state["OutputBytes"] = out.tell()
+            state["ErrorBytes"] = err.tell()
+            state["Cells"] += cells
+            state["Chunks"] += chunks
+            state["Errors"] += errors.count(b"\n")
+            _save_json(checkpoint_path, state)
+            now = time.monotonic()
+            if progress_stream is not None and now - progress["Last"] >= progress_interval:
+                progress["Last"] = now
+                _report_ingest_progress(progress_stream, state, inputs, total_bytes, progress)
+
+        with ProcessPoolExecutor(workers, initializer=_init_ingest_worker, initargs=(endpoint, access_key)) as pool:
+            pending = deque()
+            for path, end_offset, lines in _read_jsonl_batches(inputs, state["Files"], batch_size):
+                future = pool.submit(_ingest_batch, lines, embedding_endpoint_id, max_retries, retry_backoff)
+                pending.append((path, end_offset, lines, future))
+                if len(pending) >= workers * 2:
+                    complete(*pending.popleft())
+            while pending:
+                complete(*pending.popleft())
+
+    if progress_stream is not None:
+        _report_ingest_progress(progress_stream, state, inputs, total_bytes, progress)
+    return {
+        "Cells": state["Cells"],
+        "Chunks": state["Chunks"],
+        "Errors": state["Errors"],
+        "Output": output,
+        "ErrorOutput": error_path,
+        "Checkpoint": checkpoint_path,
+    }
+
+
+def _read_jsonl_batches(paths, offsets, batch_size):
+    for path in paths:
+        with open(path, "rb") as f:
+            f.seek(offsets.get(path, 0))
+            batch = []
+            while True:
+                line = f.readline()
+                if not line:
+                    break
+                if line.strip():
+                    batch.append(line)
+                if len(batch) >= batch_size:
+                    yield path, f.tell(), batch
+                    batch = []
+            if batch:
+                yield path, f.tell(), batch
+
+
+def _init_ingest_worker(endpoint, access_key):
+    global _ingest_client
+    _ingest_client = PartioClient(endpoint, access_key)
+
+
+def _ingest_batch(lines, embedding_endpoint_id, max_retries, retry_backoff):
+    cells = []
+    errors = []
+    for line in lines:
+        text = line.decode("utf-8", "replace").rstrip("\n")
+        try:
+            cell = json.loads(line)
+        except ValueError as ex:
+            errors.append({"Line": text, "Error": f"Invalid JSON: {ex}"})
+            continue
+        if not isinstance(cell, dict):
+            errors.append({"Line": text, "Error": "Invalid record: expected a JSON object"})
+            continue
+        if embedding_endpoint_id:
+            embedding = cell.setdefault("EmbeddingConfiguration", {})
+            if isinstance(embedding, dict):
+                embedding.setdefault("EmbeddingEndpointId", embedding_endpoint_id)
+        cells.append(cell)
+
+    responses = []
+    if cells:
+        try:
+            responses = _process_with_retry(cells, max_retries, retry_backoff)
+        except (PartioError, requests.RequestException) as ex:
+            if getattr(ex, "status_code", None) != 400 or len(cells) == 1:
+                errors.extend(_ingest_error(cell, ex) for cell in cells)
+            else:
+                # Isolate the bad record(s) so the rest of the batch still succeeds.
+                for cell in cells:
+                    try:
+                        responses.extend(_process_with_retry([cell], max_retries, retry_backoff))
+                    except (PartioError, requests.RequestException) as cell_ex:
+                        errors.append(_ingest_error(cell, cell_ex))
+
+    results = "".join(json.dumps(r) + "\n" for r in responses).encode("utf-8")
+    chunks = sum(_count_chunks(r) for r in responses)
+    error_lines = "".join(json.dumps(e) + "\n" for e in errors).encode("utf-8")
+    return results, error_lines, len(responses), chunks
+
+
+def _process_with_retry(cells, max_retries, retry_backoff):
+    attempt = 0
+    while True:
+        try:
+            return _ingest_client.process_batch(cells) or []
+        except (PartioError, requests.RequestException) as ex:
+            if attempt >= max_retries or not _is_transient(ex):
+                raise
+            time.sleep(retry_backoff * (2 ** attempt) * random.uniform(0.5, 1.0))
+            attempt += 1
+
+
+def _is_transient(ex):
+    if isinstance(ex, (requests.ConnectionError, requests.Timeout)):
+        return True
+    status_code = getattr(ex, "status_code", None)
+    return status_code is not None and (status_code == 429 or status_code >= 500)
+
+
+def _ingest_error(cell, ex):
+    return {"Request": cell, "Error": str(ex), "StatusCode": getattr(ex, "status_code", None)}
+
+
+def _report_ingest_progress(stream, state, inputs, total_bytes, progress):
+    done_bytes = sum(state["Files"].get(path, 0) for path in inputs)
+    elapsed = time.monotonic() - progress["Start"]
+    rate = (done_bytes - progress["StartBytes"]) / elapsed if elapsed > 0 else 0
+    cell_rate = (state["Cells"] - progress["StartCells"]) / elapsed if elapsed > 0 else 0
+    eta = (total_bytes - done_bytes) / rate if rate > 0 else None
+    percent = 100.0 * done_bytes / total_bytes if total_bytes else 100.0
+    stream.write(
+        f"ingest: {percent:.1f}% ({done_bytes / 1e6:.1f}/{total_bytes / 1e6:.1f} MB, {rate / 1e6:.2f} MB/s), "
+        f"{state['Cells']} cells ({cell_rate:.1f}/s), {state['Chunks']} chunks, {state['Errors']} errors, "
+        f"ETA {'-' if eta is None else f'{int(eta) // 60}m{int(eta) % 60:02d}s'}\n")
+    stream.flush()
+
+
+def _save_json(path, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m partio_sdk", description="Partio SDK command line tools.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest_parser = commands.add_parser("ingest", help="Process SemanticCellRequest JSONL files through process_batch.")
+    ingest_parser.add_argument("inputs", nargs="+", help="JSONL files with one SemanticCellRequest per line")
+    ingest_parser.add_argument("-o", "--output", required=True, help="JSONL file to append SemanticCellResponse records to")
+    ingest_parser.add_argument("--endpoint", default=os.environ.get("PARTIO_ENDPOINT", "http://localhost:8400"))
+    ingest_parser.add_argument("--access-key", default=os.environ.get("PARTIO_ACCESS_KEY"))
+    ingest_parser.add_argument("--embedding-endpoint-id", help="EmbeddingEndpointId for cells that do not set one")
+    ingest_parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    ingest_parser.add_argument("--batch-size", type=int, default=32, help="cells per process_batch request")
+    ingest_parser.add_argument("--checkpoint", help="checkpoint file (default: <output>.checkpoint.json)")
+    ingest_parser.add_argument("--restart", action="store_true", help="ignore any checkpoint and start over")
+    ingest_parser.add_argument("--progress-interval", type=float, default=5.0, help="seconds between progress lines")
+    ingest_parser.add_argument("--max-retries", type=int, default=4, help="retries for 429, 5xx, and connection errors")
+    ingest_parser.add_argument("--retry-backoff", type=float, default=1.0, help="initial retry backoff in seconds")
+
+    args = parser.parse_args(argv)
+    if not args.access_key:
+        parser.error("--access-key or PARTIO_ACCESS_KEY is required")
+
+    try:
+        summary = ingest(
+            args.endpoint, args.access_key, args.inputs, args.output,
+            workers=args.workers,
+            batch_size=args.batch_size,
+            embedding_endpoint_id=args.embedding_endpoint_id,
+            checkpoint_path=args.checkpoint,
+            resume=not args.restart,
+            progress_interval=args.progress_interval,
+            max_retries=args.max_retries,
+            retry_backoff=args.retry_backoff)
+    except ValueError as ex:
+        parser.error(str(ex))
+    print(json.dumps(summary, indent=2))
+    return 0 if summary["Errors"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
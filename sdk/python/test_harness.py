@@ -1,10 +1,12 @@
 """Partio Python SDK Test Harness."""
 
+import json
 import os
 import sys
+import tempfile
 import time
 import urllib.request
-from partio_sdk import PartioClient, PartioError
+from partio_sdk import EmbedResponse, LshIndex, PartioClient, PartioError, SemanticCellResponse, _loads_deferred, analyze_request_history, autotune, find_near_duplicates, get_tokenizer, ingest, input_token_budget, l2_normalize, load_autotune_result, presplit_cells, split_text, tokenizer_for_endpoint, top_k
 
 
 class SkipTest(Exception):
@@ -111,6 +113,30 @@ def main():
             assert result and len(result.get("Data", [])) > 0
         run_test("Enumerate Tenants", test_enumerate_tenants)
 
+        def test_bulk_tenants():
+            created = client.bulk_create_tenants([{"Name": f"Bulk Tenant {i}"} for i in range(3)], max_workers=3)
+            assert all(r["Success"] for r in created), "Bulk create failed"
+            tenant_ids = [r["Result"]["Id"] for r in created]
+            try:
+                exists = client.bulk_exists_tenants(tenant_ids + ["nonexistent-id-12345"])
+                assert [r["Result"] for r in exists] == [True, True, True, False]
+                fetched = client.bulk_get_tenants(tenant_ids + ["nonexistent-id-12345"])
+                assert [r["Success"] for r in fetched] == [True, True, True, False]
+                assert fetched[-1]["Error"].status_code == 404
+            finally:
+                for tenant_id in tenant_ids:
+                    client.delete_tenant(tenant_id)
+        run_test("Bulk Tenant Operations", test_bulk_tenants)
+
+        def test_cached_tenant_lookup():
+            with PartioClient(endpoint, admin_key, cache_ttl=60) as cached_client:
+                assert cached_client.get_tenant(test_tenant_id) is cached_client.get_tenant(test_tenant_id)
+                new_name = f"Cached {time.time()}"
+                cached_client.update_tenant(test_tenant_id, {"Name": new_name})
+                assert cached_client.get_tenant(test_tenant_id)["Name"] == new_name
+                cached_client.update_tenant(test_tenant_id, {"Name": "Updated Tenant"})
+        run_test("Cached Tenant Lookup", test_cached_tenant_lookup)
+
         # User CRUD
         def test_create_user():
             nonlocal test_user_id
@@ -326,6 +352,39 @@ def main():
             assert result is not None
         run_test("Enumerate Request History", test_enumerate_history)
 
+        def test_request_statistics():
+            result = client.get_request_statistics(timeframe="Hour")
+            assert result is not None and "Buckets" in result
+            assert result.get("TotalSuccess", 0) + result.get("TotalFailure", 0) > 0
+        run_test("Request Statistics", test_request_statistics)
+
+        def test_analyze_request_history():
+            report = analyze_request_history(client, {"MaxResults": 25}, max_entries=25, max_workers=4)
+            assert report["EntryCount"] > 0
+            assert report["Endpoints"], "Expected per-endpoint latency summaries"
+            assert 0.0 <= report["UpstreamShare"] <= 1.0
+            assert "Purposes" in report
+        run_test("Analyze Request History", test_analyze_request_history)
+
+        def test_analyze_request_history_purposes():
+            probe = {"Purpose": "CapabilityProbe", "Url": "http://p/api/show", "RequestBody": '{"model": "m"}', "Success": True, "ResponseTimeMs": 1}
+            first = {"Purpose": "EmbeddingRequest", "Url": "http://p/api/embed", "RequestBody": '{"model": "m", "input": ["a"]}', "Success": False, "StatusCode": 500, "ResponseTimeMs": 100}
+            retry = dict(first, Success=True, StatusCode=200)
+            other = dict(retry, RequestBody='{"model": "m", "input": ["b"]}')
+
+            class FakeClient:
+                def iter_request_history(self, req=None):
+                    yield {"Id": "req_1", "HttpMethod": "POST", "HttpUrl": "/v1.0/process", "ResponseTimeMs": 400}
+
+                def get_request_history_details(self, ids, max_workers=8):
+                    return [{"Item": "req_1", "Success": True, "Result": {"EmbeddingCalls": [probe, first, other, retry]}, "Error": None}]
+
+            report = analyze_request_history(FakeClient())
+            assert report["Models"]["m"]["Count"] == 3, "Probe calls must not count toward model latency"
+            assert report["Purposes"]["CapabilityProbe"]["Count"] == 1
+            assert report["RetryRate"] == 0.25, f"Only the repeated body is a retry, got {report['RetryRate']}"
+        run_test("Analyze Request History (Purposes)", test_analyze_request_history_purposes)
+
         def test_explore_embedding_endpoint():
             skip_if_provider_unavailable()
             result = client.explore_embedding_endpoint({
@@ -375,6 +434,48 @@ def main():
             assert result["Chunks"][0].get("Tags") and len(result["Chunks"][0]["Tags"]) > 0, "No tags on chunk"
         run_test("Process Single Cell", test_process_single_cell)
 
+        # Typed response models
+        def test_process_typed_models():
+            skip_if_provider_unavailable()
+            active_ep = get_harness_embedding_endpoint()
+
+            with PartioClient(endpoint, admin_key, typed_models=True) as typed_client:
+                result = typed_client.process({
+                    "Type": "Text",
+                    "Text": "Typed models decode chunks lazily.",
+                    "EmbeddingConfiguration": {"L2Normalization": False, "EmbeddingEndpointId": active_ep["Id"]}
+                })
+                assert isinstance(result, SemanticCellResponse), "Expected a typed response"
+                assert result.chunks and result.chunks[0].embeddings, "No embeddings"
+                assert result["Chunks"][0]["Text"] == result.chunks[0].text, "Dict-style access mismatch"
+                assert typed_client.enumerate_tenants().data, "Expected typed enumeration data"
+        run_test("Process (Typed Models)", test_process_typed_models)
+
+        def test_deferred_embeddings_parsing():
+            cell = json.dumps({
+                "GUID": "c1",
+                "Text": 'Escaped {"Embeddings": [1,2]}, "Embeddings" :[3]',
+                "Chunks": [
+                    {"Text": "a", "Embeddings": [0.1, -2.5e-3, 3]},
+                    {"Text": "b", "Embeddings": None},
+                    {"Text": "c", "Embeddings": []},
+                ],
+                "Children": [{"GUID": "c2", "Chunks": [{"Text": "d", "Embeddings": [1e10, 0]}], "Children": []}],
+            })
+            parsed = SemanticCellResponse(_loads_deferred(cell))
+            assert parsed.text == json.loads(cell)["Text"], "Escaped text must not be rewritten"
+            assert parsed.chunks[0].embeddings == [0.1, -2.5e-3, 3]
+            assert parsed.chunks[1].embeddings is None
+            assert parsed.chunks[2].embeddings == []
+            assert parsed.children[0].chunks[0].embeddings == [1e10, 0]
+            assert parsed.to_dict() == json.loads(cell), "Cell did not round-trip"
+
+            embed = json.dumps({"Success": True, "Embeddings": [[0.5, 1], [], [-1e-5]], "Count": 3})
+            parsed = EmbedResponse(_loads_deferred(embed))
+            assert parsed.embeddings == [[0.5, 1], [], [-1e-5]]
+            assert parsed.to_dict() == json.loads(embed), "Embed response did not round-trip"
+        run_test("Deferred Embeddings Parsing", test_deferred_embeddings_parsing)
+
         # Process Table - Row
         def test_process_table_row():
             skip_if_provider_unavailable()
@@ -486,6 +587,150 @@ def main():
                 assert e.status_code == 400
         run_test("Regex Strategy Missing Pattern (400)", test_regex_missing_pattern)
 
+        # Throughput autotune
+        def test_autotune():
+            skip_if_provider_unavailable()
+            active_ep = get_harness_embedding_endpoint()
+            store_path = os.path.join(tempfile.mkdtemp(), "autotune.json")
+
+            result = autotune(
+                client,
+                active_ep["Id"],
+                [{"Type": "Text", "Text": "Partio autotune sample cell."}],
+                batch_sizes=(1, 2),
+                concurrency_levels=(1, 2),
+                requests_per_trial=2,
+                store_path=store_path)
+            assert len(result["Trials"]) == 4, "Expected one trial per batch size and concurrency"
+            assert result["Recommended"]["BatchSize"] in (1, 2)
+            assert load_autotune_result(active_ep["Id"], store_path)["Recommended"] == result["Recommended"]
+        run_test("Autotune Throughput", test_autotune)
+
+        # Client-side pre-splitting
+        def test_presplit_oversized_cell():
+            skip_if_provider_unavailable()
+            active_ep = get_harness_embedding_endpoint()
+            tokenizer = get_tokenizer("BertWordPiece")
+
+            cells = presplit_cells([{
+                "Type": "Text",
+                "Text": " ".join(["Partio splits oversized documents before they leave the client."] * 40),
+                "EmbeddingConfiguration": {"L2Normalization": False, "EmbeddingEndpointId": active_ep["Id"]}
+            }], tokenizer, max_cell_tokens=64)
+            assert len(cells) > 1, "Expected the cell to be split"
+            assert all(tokenizer.count_tokens(cell["Text"]) <= 64 for cell in cells)
+
+            result = client.process_batch(cells)
+            assert result and len(result) == len(cells), "Expected one response per split cell"
+        run_test("Presplit Oversized Cell", test_presplit_oversized_cell)
+
+        def test_split_text_non_ascii():
+            tokenizer = get_tokenizer("BertWordPiece")
+            texts = {
+                "CJK": "分词器在客户端预先切分超大的文档。" * 10,
+                "Hangul": "한국어 문장은 자모로 분해됩니다. " * 12,
+                "Accented": "Café déjà vu, naïve façade, crème brûlée. " * 20,
+            }
+            for name, text in texts.items():
+                assert tokenizer.count_tokens(text) > 160, f"{name} sample is too short"
+                pieces = split_text(text, 160, tokenizer)
+                assert len(pieces) > 1, f"Expected {name} text to be split"
+                assert all(tokenizer.count_tokens(piece) <= 160 for piece in pieces), f"{name} piece over budget"
+        run_test("Split Text (Non-ASCII)", test_split_text_non_ascii)
+
+        def test_tokenizer_for_endpoint():
+            profile = {"TokenizerKind": "BertWordPiece", "EffectiveInputBudget": 504, "ProfileSource": "ProviderDefault"}
+            assert tokenizer_for_endpoint({"TokenizationProfile": profile}).kind == "BertWordPiece"
+            assert input_token_budget(profile) == 504
+
+            minilm = {"Id": "eep_test", "ApiFormat": "Ollama", "Model": "all-minilm", "Tokenization": {"AutoDetect": False}}
+            assert tokenizer_for_endpoint(minilm).kind == "BertWordPiece", "Expected the server's Ollama BERT default"
+            assert input_token_budget(minilm) == 504
+            try:
+                tokenizer_for_endpoint({"Id": "eep_test", "ApiFormat": "Ollama", "Model": "all-minilm", "Tokenization": None})
+                raise AssertionError("Expected auto-detected endpoints to require a resolved profile")
+            except ValueError:
+                pass
+        run_test("Tokenizer For Endpoint", test_tokenizer_for_endpoint)
+
+        # Client-side vector utilities
+        def test_vector_utilities():
+            skip_if_provider_unavailable()
+            active_ep = get_harness_embedding_endpoint()
+            try:
+                import numpy
+            except ImportError:
+                raise SkipTest("requires numpy")
+
+            inputs = ["Partio embeds text.", "Partio embeds text.", "Tables are chunked by row."]
+            raw = client.embed({"EndpointId": active_ep["Id"], "Input": inputs, "L2Normalization": False})
+            normalized = client.embed({"EndpointId": active_ep["Id"], "Input": inputs, "L2Normalization": True})
+            assert numpy.allclose(l2_normalize(raw["Embeddings"]), normalized["Embeddings"], atol=1e-4), "Local normalization mismatch"
+
+            indices, _ = top_k(raw["Embeddings"][2:], raw["Embeddings"], k=1)
+            assert indices[0][0] == 2, "Expected a vector to be its own nearest neighbor"
+            pairs = find_near_duplicates(raw["Embeddings"], threshold=0.99)
+            assert (0, 1) in [(i, j) for i, j, _ in pairs], "Expected identical inputs to be near duplicates"
+        run_test("Vector Utilities", test_vector_utilities)
+
+        def test_vector_utilities_edge_cases():
+            try:
+                import numpy
+            except ImportError:
+                raise SkipTest("requires numpy")
+
+            indices, scores = top_k([1, 0], [], k=3)
+            assert indices.shape == (1, 0) and scores.shape == (1, 0), "Expected no neighbors for an empty set"
+
+            vectors = [[1, 0], [0.6, 0.8], [-1, 0]]
+            pairs = find_near_duplicates(vectors, threshold=-1.0)
+            assert [(i, j) for i, j, _ in pairs] == [(0, 1), (0, 2), (1, 2)], "Expected only i < j pairs"
+            try:
+                find_near_duplicates(vectors[:2], threshold=0.5, index=LshIndex(vectors))
+                raise AssertionError("Expected an index over different vectors to be rejected")
+            except ValueError:
+                pass
+        run_test("Vector Utilities (Edge Cases)", test_vector_utilities_edge_cases)
+
+        # JSONL ingestion
+        def test_ingest_jsonl():
+            skip_if_provider_unavailable()
+            active_ep = get_harness_embedding_endpoint()
+            work_dir = tempfile.mkdtemp()
+            input_path = os.path.join(work_dir, "cells.jsonl")
+            output_path = os.path.join(work_dir, "results.jsonl")
+            with open(input_path, "w", encoding="utf-8") as f:
+                for i in range(6):
+                    f.write(json.dumps({"Type": "Text", "Text": f"Ingested cell number {i}."}) + "\n")
+
+            summary = ingest(endpoint, admin_key, [input_path], output_path, workers=2, batch_size=2,
+                             embedding_endpoint_id=active_ep["Id"], progress_stream=None)
+            assert summary["Cells"] == 6 and summary["Errors"] == 0, f"Unexpected summary: {summary}"
+
+            resumed = ingest(endpoint, admin_key, [input_path], output_path, workers=2, batch_size=2,
+                             embedding_endpoint_id=active_ep["Id"], progress_stream=None)
+            assert resumed["Cells"] == 6, "Resumed run should not reprocess cells"
+            with open(output_path, "r", encoding="utf-8") as f:
+                assert len(f.readlines()) == 6, "Expected one output record per cell"
+        run_test("Ingest JSONL", test_ingest_jsonl)
+
+        def test_ingest_resume_missing_output():
+            work_dir = tempfile.mkdtemp()
+            input_path = os.path.join(work_dir, "cells.jsonl")
+            output_path = os.path.join(work_dir, "results.jsonl")
+            with open(input_path, "w", encoding="utf-8") as f:
+                f.write(json.dumps({"Type": "Text", "Text": "Ingested cell."}) + "\n")
+            with open(output_path + ".checkpoint.json", "w", encoding="utf-8") as f:
+                json.dump({"Files": {input_path: 0}, "OutputBytes": 664, "ErrorBytes": 0, "Cells": 1, "Chunks": 1, "Errors": 0}, f)
+
+            try:
+                ingest(endpoint, admin_key, [input_path], output_path, progress_stream=None)
+                raise AssertionError("Expected resuming without the output file to fail")
+            except ValueError as e:
+                assert "--restart" in str(e)
+            assert not os.path.exists(output_path) or os.path.getsize(output_path) == 0, "Output must not be padded"
+        run_test("Ingest Resume (Missing Output)", test_ingest_resume_missing_output)
+
         # Negative test: table strategy on text atom
         def test_table_strategy_on_text():
             skip_if_provider_unavailable()